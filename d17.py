@@ -1,4 +1,63 @@
-def execute_program(registers, program):
+import json
+import sys
+from collections import Counter, deque
+
+try:
+    import numpy as np
+except ImportError:  # Only needed for the lockstep emulator
+    np = None
+
+# Tracing levels for execute_program
+TRACE_OFF = "off"
+TRACE_RING = "ring"
+TRACE_COUNTERS = "counters"
+
+
+class ExecutionTrace:
+    """
+    Opt-in diagnostics for execute_program.
+
+    TRACE_RING keeps the last ring_size states as (ip, A, B, C, opcode, operand) tuples,
+    TRACE_COUNTERS aggregates how often each opcode ran and each jump target was taken.
+    """
+
+    def __init__(self, level=TRACE_RING, ring_size=64):
+        if level not in (TRACE_RING, TRACE_COUNTERS):
+            raise ValueError(f"Unknown trace level: {level}")
+        self.level = level
+        self.ring = deque(maxlen=ring_size)
+        self.opcode_counts = Counter()
+        self.jump_counts = Counter()
+
+    def record(self, ip, A, B, C, opcode, operand, jumped):
+        """Records one executed instruction (registers as they are after it ran)."""
+        if self.level == TRACE_RING:
+            self.ring.append((ip, A, B, C, opcode, operand))
+        else:
+            self.opcode_counts[opcode] += 1
+            if jumped:
+                self.jump_counts[operand] += 1
+
+    def to_json(self):
+        """Dumps the collected trace as a JSON document."""
+        if self.level == TRACE_RING:
+            states = [dict(zip(("ip", "A", "B", "C", "opcode", "operand"), state)) for state in self.ring]
+            return json.dumps({"level": self.level, "last_states": states})
+        return json.dumps({
+            "level": self.level,
+            "steps": sum(self.opcode_counts.values()),
+            "opcodes": {str(opcode): count for opcode, count in sorted(self.opcode_counts.items())},
+            "jump_targets": {str(target): count for target, count in sorted(self.jump_counts.items())},
+        })
+
+
+def execute_program(registers, program, trace=None):
+    """
+    Interprets the program and returns its output as a comma-separated string.
+
+    Pass an ExecutionTrace to collect the last states or per-opcode counters; without
+    one (the default) nothing is recorded or printed.
+    """
     # Registers
     A, B, C = registers['A'], registers['B'], registers['C']
 
@@ -33,6 +92,8 @@ def execute_program(registers, program):
             B = combo_value(operand) % 8
         elif opcode == 3:  # jnz: if A != 0, jump to operand
             if A != 0:
+                if trace is not None:
+                    trace.record(ip, A, B, C, opcode, operand, True)
                 ip = operand
                 continue  # Skip ip increment after a jump
         elif opcode == 4:  # bxc: B = B ^ C
@@ -46,7 +107,8 @@ def execute_program(registers, program):
         else:
             raise ValueError(f"Unknown opcode: {opcode}")
 
-        print(f"ip = {ip}, A = {A}, B = {B}, C= {C}, opcode = {opcode}, operand = {operand}, output = {output}")
+        if trace is not None:
+            trace.record(ip, A, B, C, opcode, operand, False)
 
         # Move to the next instruction
         ip += 2
@@ -54,8 +116,176 @@ def execute_program(registers, program):
     return ",".join(map(str, output))
 
 
+# Source templates for the compiled fast path; combo operands 4-6 read registers
+COMBO_SOURCE = {0: "0", 1: "1", 2: "2", 3: "3", 4: "A", 5: "B", 6: "C"}
+
+
+def _compile_instruction(opcode, operand, indent):
+    """Emits the Python source lines for a single instruction."""
+    combo = COMBO_SOURCE.get
+
+    if opcode in (0, 2, 5, 6, 7) and combo(operand) is None:
+        # Only fails when executed, exactly like the interpreter
+        return [indent + 'raise ValueError("Invalid combo operand 7 encountered.")']
+
+    if opcode == 0:  # adv: A = A >> combo
+        return [indent + f"A >>= {combo(operand)}"]
+    elif opcode == 1:  # bxl
+        return [indent + f"B ^= {operand}"]
+    elif opcode == 2:  # bst
+        return [indent + f"B = {combo(operand)} & 7"]
+    elif opcode == 3:  # jnz
+        return [indent + "if A:", indent + f"    pc = {operand}", indent + "    continue"]
+    elif opcode == 4:  # bxc
+        return [indent + "B ^= C"]
+    elif opcode == 5:  # out
+        return [indent + f"append({combo(operand)} & 7)"]
+    elif opcode == 6:  # bdv
+        return [indent + f"B = A >> {combo(operand)}"]
+    elif opcode == 7:  # cdv
+        return [indent + f"C = A >> {combo(operand)}"]
+    return [indent + f'raise ValueError("Unknown opcode: {opcode}")']
+
+
+def compile_program(program):
+    """
+    Compiles a program into a specialized callable run(A, B=0, C=0) -> list of outputs.
+
+    Every jump target is a literal, so the program is split into one straight-line
+    block per entry point (0 and every jnz target reachable from it). Operands are
+    resolved ahead of time, divisions by powers of two become shifts and nothing is
+    printed, so the result is identical to execute_program but without the per-step
+    decode cost.
+    """
+    program = list(program)
+
+    # A jump can land on an odd ip, whose block decodes different jnz instructions, so
+    # entry points are collected by walking every block reached so far
+    entry_points = {0}
+    pending = [0]
+    while pending:
+        entry = pending.pop()
+        for ip in range(entry, len(program), 2):
+            if program[ip] == 3:
+                target = program[ip + 1] if ip + 1 < len(program) else 0
+                if target not in entry_points:
+                    entry_points.add(target)
+                    pending.append(target)
+    entry_points = sorted(entry_points)
+
+    lines = ["def run(A, B=0, C=0):",
+             "    output = []",
+             "    append = output.append",
+             "    pc = 0",
+             "    while True:"]
+    for index, entry in enumerate(entry_points):
+        keyword = "if" if index == 0 else "elif"
+        lines.append(f"        {keyword} pc == {entry}:")
+        for ip in range(entry, len(program), 2):
+            operand = program[ip + 1] if ip + 1 < len(program) else 0
+            lines.extend(_compile_instruction(program[ip], operand, " " * 12))
+        lines.append("            return output")
+    lines.append("        return output")
+
+    namespace = {}
+    exec(compile("\n".join(lines), "<d17 compiled program>", "exec"), namespace)
+    return namespace["run"]
+
+
+def execute_compiled(registers, program):
+    """Runs the program through compile_program and formats the output like execute_program."""
+    output = compile_program(program)(registers['A'], registers['B'], registers['C'])
+    return ",".join(map(str, output))
+
+
+def _shift_right(values, amounts):
+    """Vectorized A >> amount on uint64 lanes; shifting by 64 or more yields 0."""
+    clipped = np.minimum(amounts, np.uint64(63))
+    return np.where(amounts >= 64, np.uint64(0), values >> clipped)
+
+
+def execute_lockstep(program, a_values, B=0, C=0, max_outputs=1, max_steps=None):
+    """
+    Runs the program for a whole array of starting A values at once.
+
+    Each lane keeps its own registers and instruction pointer; every step applies each
+    instruction to the lanes currently pointing at it. Lanes drop out once they halt or
+    have produced max_outputs values, and registers are uint64, so A must be below 2**64.
+
+    Returns (outputs, counts): an (n, max_outputs) int8 array padded with -1 and the number
+    of values each lane produced, matching execute_program lane for lane.
+    """
+    if np is None:
+        raise ImportError("execute_lockstep requires numpy")
+
+    A = np.array(a_values, dtype=np.uint64).ravel()
+    lanes = len(A)
+    B = np.full(lanes, B, dtype=np.uint64)
+    C = np.full(lanes, C, dtype=np.uint64)
+    ip = np.zeros(lanes, dtype=np.int64)
+    outputs = np.full((lanes, max_outputs), -1, dtype=np.int8)
+    counts = np.zeros(lanes, dtype=np.int64)
+    active = np.ones(lanes, dtype=bool) if max_outputs > 0 else np.zeros(lanes, dtype=bool)
+    steps = 0
+
+    while active.any() and (max_steps is None or steps < max_steps):
+        # Lanes are grouped by where they stood at the start of the step, so a lane a jump
+        # moves onto a later pc does not run a second instruction in the same step
+        ip_at_start = ip.copy()
+        for pc in np.unique(ip_at_start[active]):
+            lane = np.flatnonzero(active & (ip_at_start == pc))
+            opcode = program[pc]
+            operand = program[pc + 1] if pc + 1 < len(program) else 0
+
+            if opcode in (0, 2, 5, 6, 7):
+                if operand <= 3:
+                    combo = np.full(len(lane), operand, dtype=np.uint64)
+                elif operand == 4:
+                    combo = A[lane]
+                elif operand == 5:
+                    combo = B[lane]
+                elif operand == 6:
+                    combo = C[lane]
+                else:
+                    raise ValueError("Invalid combo operand 7 encountered.")
+
+            if opcode == 0:  # adv
+                A[lane] = _shift_right(A[lane], combo)
+            elif opcode == 1:  # bxl
+                B[lane] ^= np.uint64(operand)
+            elif opcode == 2:  # bst
+                B[lane] = combo & np.uint64(7)
+            elif opcode == 3:  # jnz
+                jumping = lane[A[lane] != 0]
+                ip[jumping] = operand - 2  # Cancel out the increment below
+            elif opcode == 4:  # bxc
+                B[lane] ^= C[lane]
+            elif opcode == 5:  # out
+                outputs[lane, counts[lane]] = (combo & np.uint64(7)).astype(np.int8)
+                counts[lane] += 1
+            elif opcode == 6:  # bdv
+                B[lane] = _shift_right(A[lane], combo)
+            elif opcode == 7:  # cdv
+                C[lane] = _shift_right(A[lane], combo)
+            else:
+                raise ValueError(f"Unknown opcode: {opcode}")
+
+            ip[lane] += 2
+
+        active &= (ip < len(program)) & (counts < max_outputs)
+        steps += 1
+
+    return outputs, counts
+
+
+def first_outputs(program, a_values):
+    """First value the program outputs for each starting A, or -1 when it outputs nothing."""
+    outputs, _ = execute_lockstep(program, a_values, max_outputs=1)
+    return outputs[:, 0]
+
+
 # Input file handling
-def main():
+def main(trace_level=TRACE_OFF):
     # Initialize registers
     # registers = {'A': 729, 'B': 0, 'C': 0}
     registers = {'A': 17323786, 'B': 0, 'C': 0}
@@ -66,11 +296,15 @@ def main():
         program = list(map(int, file.read().split(",")))  # Convert file contents to a list of integers
 
     # Execute the program and get the output
-    result = execute_program(registers, program)
+    trace = None if trace_level == TRACE_OFF else ExecutionTrace(trace_level)
+    result = execute_program(registers, program, trace)
 
     # Print the final output
     print("Output:", result)
+    if trace is not None:
+        print(trace.to_json())
 
 
 if __name__ == "__main__":
-    main()
+    # Optional argument: the trace level (off, ring or counters)
+    main(sys.argv[1] if len(sys.argv) > 1 else TRACE_OFF)
@@ -0,0 +1,119 @@
+import random
+import sys
+import time
+
+from d17 import compile_program, execute_compiled, execute_lockstep, execute_program, np
+
+# (name, program); both loop once per octal digit of A until A reaches 0
+BENCH_PROGRAMS = [
+    ("day17 input", [2, 4, 1, 1, 7, 5, 1, 5, 4, 1, 5, 5, 0, 3, 3, 0]),
+    ("example", [0, 3, 5, 4, 3, 0]),
+]
+
+
+# Jumps into odd ips, whose blocks hold jnz instructions no even-ip block has, and
+# lanes that diverge: with A=1 and A=2 one lane jumps onto the out the other just ran
+REGRESSION_PROGRAMS = [
+    [3, 1, 6, 5, 1, 3, 6, 4, 5, 6],
+    [0, 1, 3, 6, 5, 4, 5, 4],
+]
+
+
+class StepLimitExceeded(Exception):
+    pass
+
+
+class StepLimit:
+    """Stand-in trace for execute_program that aborts runs longer than max_steps."""
+
+    def __init__(self, max_steps):
+        self.max_steps = max_steps
+        self.steps = 0
+
+    def record(self, *state):
+        self.steps += 1
+        if self.steps > self.max_steps:
+            raise StepLimitExceeded
+
+
+def reference_output(program, a, max_steps=500):
+    """Interpreter output, "error" if it raises ValueError, or None if it does not halt in time."""
+    try:
+        return execute_program({'A': a, 'B': 0, 'C': 0}, program, StepLimit(max_steps))
+    except ValueError:
+        return "error"
+    except StepLimitExceeded:
+        return None
+
+
+def generated_programs(count, rng):
+    """The regression programs followed by count random ones, jumps to odd ips included."""
+    yield from REGRESSION_PROGRAMS
+    for _ in range(count):
+        yield [rng.randrange(8) for _ in range(2 * rng.randint(1, 6))]
+
+
+def check_agreement(count=3_000, seed=17):
+    """Asserts that compiled and lockstep runs match the interpreter on generated programs that halt."""
+    rng = random.Random(seed)
+    checked = batches = 0
+    for program in generated_programs(count, rng):
+        # Small A keeps 2 ** register shifts cheap in the interpreter
+        a_values = [1, 2, 15120] + [rng.getrandbits(12) for _ in range(5)]
+        expected = [reference_output(program, a) for a in a_values]
+
+        for a, reference in zip(a_values, expected):
+            if reference is None:
+                continue
+            try:
+                compiled = execute_compiled({'A': a, 'B': 0, 'C': 0}, program)
+            except ValueError:
+                compiled = "error"
+            assert compiled == reference, f"compiled {program} with A={a}: {compiled!r} != {reference!r}"
+            checked += 1
+
+        # Lockstep raises for the whole batch on an invalid operand, so only clean batches
+        if np is not None and all(reference not in (None, "error") for reference in expected):
+            for max_outputs in (1, 3):
+                outputs, counts = execute_lockstep(program, a_values, max_outputs=max_outputs)
+                for a, reference, row, produced in zip(a_values, expected, outputs.tolist(), counts.tolist()):
+                    values = [int(value) for value in reference.split(",")][:max_outputs] if reference else []
+                    assert row[:produced] == values and produced == len(values), \
+                        f"lockstep {program} with A={a}: {row[:produced]} != {values}"
+            batches += 1
+
+    print(f"Agreement: {checked:,} compiled runs and {batches:,} lockstep batches match the interpreter")
+
+
+def count_steps(program, a):
+    """Counts the instructions executed: one pass of the loop body per octal digit of A."""
+    digits = max(1, (a.bit_length() + 2) // 3)
+    return digits * (len(program) // 2)
+
+
+def bench(name, program, a_values):
+    steps = sum(count_steps(program, a) for a in a_values)
+
+    start = time.perf_counter()
+    interpreted = [execute_program({'A': a, 'B': 0, 'C': 0}, program) for a in a_values]
+    interpreter_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    run = compile_program(program)
+    compiled = [",".join(map(str, run(a))) for a in a_values]
+    compiled_time = time.perf_counter() - start
+
+    assert interpreted == compiled, f"{name}: compiled output differs from the interpreter"
+    print(f"{name}: {steps:,} steps | interpreter {interpreter_time:.3f}s "
+          f"({steps / interpreter_time:,.0f} steps/s) | compiled {compiled_time:.3f}s "
+          f"({steps / compiled_time:,.0f} steps/s) | speedup {interpreter_time / compiled_time:.1f}x")
+
+
+if __name__ == "__main__":
+    # Number of 48-bit starting values per program; 20000 runs roughly 2.5 million steps
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    rng = random.Random(17)
+    a_values = [rng.getrandbits(48) for _ in range(runs)]
+    check_agreement()
+    for name, program in BENCH_PROGRAMS:
+        bench(name, program, a_values)
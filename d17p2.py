@@ -1,67 +1,110 @@
-def run(A):
-    """ Simulate the program and return its output. """
-    B, C = 0, 0
-    output = []
-
-    while A > 0:
-        B = A % 8  # 2,4: B = A % 8
-        B ^= 1     # 1,1: B = B ^ 1
-        C = A // (1 << B)  # 7,5: C = A // (2^B)
-        B ^= 5     # 1,5: B = B ^ 5
-        B ^= C     # 4,3: B = B ^ C
-        output.append(B % 8)  # 5,5: Output B % 8
-        A //= 8    # 0,3: A = A // 8
-    return output
-
-def recombine(sequence):
-    """ Recombine the 3-bit sequences into the full value of A. """
-    result = sequence[0]
-    shift = 10
-    for value in sequence[1:]:
-        result += (value >> 7) << shift
-        shift += 3
-    return result
+from array import array
+
+from d17 import compile_program, first_outputs, np
+
+
+def frontier_buffer(bits):
+    """ Compact buffer for partial A values: array('Q') while they fit in 64 bits, a list beyond. """
+    return array('Q') if bits <= 64 else []
 
 def find_minimal_A(program):
     """
     Find the minimal starting value of A that reproduces the program output.
     """
+    program = list(program)
+    compiled = compile_program(program)
+
     def safe_run(a):
-        """ Wrap run(a) to handle empty outputs gracefully. """
-        output = run(a)
+        """ Run the program itself for a and handle empty outputs gracefully. """
+        output = compiled(a)
         return output[0] if output else -1  # Use -1 as a placeholder for no output
 
-    # Step 1: Precompute all 10-bit candidates
-    steps = [safe_run(a) for a in range(2 ** 10)]
+    # Step 1: Precompute all 10-bit candidates, vectorized when numpy is available; both
+    # paths execute the given program, so the table does not depend on what is installed
+    if np is not None:
+        steps = first_outputs(program, np.arange(2 ** 10)).tolist()
+    else:
+        steps = [safe_run(a) for a in range(2 ** 10)]
+
+    # Step 2: The frontier keeps, per candidate, only the partially recombined A and its
+    # last 10-bit window, in two flat buffers instead of one list per sequence
+    values = array('Q', (i for i in range(2 ** 10) if steps[i] == program[0]))
+    windows = array('H', values)
+    shift = 10
+    min_A = float('inf')
 
-    # Step 2: Start with candidates that match the first program output
-    valid_sequences = [[i] for i in range(2 ** 10) if steps[i] == program[0]]
+    if len(program) == 1:
+        return min((A for A in values if compiled(A) == program), default=min_A)
 
-    # Step 3: Build valid sequences for each subsequent program output
-    for target in program[1:]:
-        next_sequences = []
-        for seq in valid_sequences:
-            current = seq[-1] >> 3  # Shift by 3 bits
+    # Step 3: Extend the frontier for each subsequent program output
+    for target in program[1:-1]:
+        next_values, next_windows = frontier_buffer(shift + 3), array('H')
+        for value, window in zip(values, windows):
+            current = window >> 3  # Shift by 3 bits
             for i in range(8):  # Test all possible lower 3 bits
                 candidate = (i << 7) + current
                 if steps[candidate] == target:
-                    next_sequences.append(seq + [candidate])
-        valid_sequences = next_sequences
+                    next_values.append(value + (i << shift))
+                    next_windows.append(candidate)
+        values, windows = next_values, next_windows
+        shift += 3
 
-    # Step 4: Recombine sequences and validate full program
-    min_A = float('inf')
-    print(valid_sequences)
-    for seq in valid_sequences:
-        A = recombine(seq)
-        if run(A) == program:
-            min_A = min(min_A, A)
+    # Step 4: Stream the last extension straight into validation; a candidate only grows
+    # with its top digit, so anything not below the best A so far is skipped
+    for value, window in zip(values, windows):
+        if value >= min_A:
+            continue
+        current = window >> 3
+        for i in range(8):
+            A = value + (i << shift)
+            if A >= min_A:
+                break
+            if steps[(i << 7) + current] == program[-1] and compiled(A) == program:
+                min_A = A
+                break
 
     return min_A
 
+def a_shift(program):
+    """ Number of bits the program drops from A per loop (the literal operand of its adv). """
+    shifts = {program[ip + 1] for ip in range(0, len(program) - 1, 2)
+              if program[ip] == 0 and 1 <= program[ip + 1] <= 3}
+    if len(shifts) != 1:
+        raise ValueError("Quine search needs exactly one adv with a non-zero literal operand.")
+    return shifts.pop()
+
+def solve_quine(program):
+    """
+    Find the minimal A for which any program outputs itself, or None if there is none.
+
+    Each loop of the program consumes the low bits of A and only the remaining high bits
+    influence later outputs, so A is built from the last output backwards: a prefix
+    survives only if running it reproduces the matching tail of the program. Digits are
+    tried in increasing order depth-first, so the first complete match is the minimum.
+    """
+    run = compile_program(program)
+    shift = a_shift(program)
+    target = list(program)
+
+    def extend(prefix, index):
+        if index < 0:
+            return prefix
+        for digit in range(1 << shift):
+            candidate = (prefix << shift) | digit
+            if run(candidate) == target[index:]:
+                found = extend(candidate, index - 1)
+                if found is not None:
+                    return found
+        return None
+
+    return extend(0, len(target) - 1)
+
 
-# Input program
-program = [2, 4, 1, 1, 7, 5, 1, 5, 4, 1, 5, 5, 0, 3, 3, 0]
+if __name__ == "__main__":
+    # Input program
+    program = [2, 4, 1, 1, 7, 5, 1, 5, 4, 1, 5, 5, 0, 3, 3, 0]
 
-# Find and print the minimal A
-minimal_A = find_minimal_A(program)
-print("The minimal A that reproduces the program is:", minimal_A)
+    # Find and print the minimal A
+    minimal_A = find_minimal_A(program)
+    print("The minimal A that reproduces the program is:", minimal_A)
+    print("Generic quine solver agrees:", solve_quine(program))
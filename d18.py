@@ -1,3 +1,7 @@
+import mmap
+import sys
+from array import array
+from bisect import bisect_right, insort
 from collections import deque
 
 def parse_input(file_path):
@@ -6,13 +10,96 @@ def parse_input(file_path):
         lines = f.readlines()
     return [tuple(map(int, line.strip().split(','))) for line in lines]
 
+class CoordinateBuffer:
+    """
+    Packed byte coordinates: x and y interleaved in one array('I').
+
+    Behaves like the list of (x, y) tuples from parse_input, but slicing returns a view
+    on the same memory and iteration reads the values in place instead of copying.
+    """
+
+    def __init__(self, values):
+        self.values = memoryview(values)
+
+    def __len__(self):
+        return len(self.values) // 2
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                raise ValueError("CoordinateBuffer only supports contiguous slices.")
+            return CoordinateBuffer(self.values[2 * start:2 * max(start, stop)])
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("coordinate index out of range")
+        return self.values[2 * index], self.values[2 * index + 1]
+
+    def __iter__(self):
+        return zip(self.values[0::2], self.values[1::2])
+
+def load_coordinates(file_path, chunk_size=1 << 20):
+    """Memory-maps the input file and parses it into a CoordinateBuffer."""
+    values = array('I')
+    with open(file_path, 'rb') as f:
+        if f.seek(0, 2) == 0:
+            return CoordinateBuffer(values)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            position = 0
+            while position < len(data):
+                # Cut chunks at a newline so no number is split between them
+                end = data.find(b'\n', min(position + chunk_size, len(data) - 1))
+                end = len(data) if end == -1 else end + 1
+                values.extend(map(int, data[position:end].replace(b',', b' ').split()))
+                position = end
+    return CoordinateBuffer(values)
+
 def simulate_falling_bytes(byte_positions, grid_size, num_bytes):
-    """Simulates the falling bytes on the grid."""
+    """Simulates the falling bytes on the grid (a list of tuples or a CoordinateBuffer)."""
     grid = [[0 for _ in range(grid_size)] for _ in range(grid_size)]
     for x, y in byte_positions[:num_bytes]:
         grid[y][x] = 1  # Mark as corrupted
     return grid
 
+def simulate_falling_bytes_bits(byte_positions, grid_size, num_bytes):
+    """Simulates the falling bytes with one bitmask per row (bit x set means corrupted)."""
+    rows = [0] * grid_size
+    for x, y in byte_positions[:num_bytes]:
+        rows[y] |= 1 << x
+    return rows
+
+def bfs_shortest_path_bits(rows, start, goal):
+    """
+    Finds the shortest path like bfs_shortest_path, but on the row bitmasks.
+
+    The free cells of all rows are packed into one integer, each row padded to whole
+    bytes with at least one zero guard bit so horizontal shifts never wrap. Every step
+    then expands the whole frontier at once with four shifts and a mask.
+    """
+    size = len(rows)
+    row_bytes = size // 8 + 1
+    stride = row_bytes * 8
+    row_mask = (1 << size) - 1
+    free = int.from_bytes(b''.join((~row & row_mask).to_bytes(row_bytes, 'little') for row in rows), 'little')
+
+    start_bit = 1 << (start[1] * stride + start[0])
+    goal_bit = 1 << (goal[1] * stride + goal[0])
+    frontier = visited = start_bit
+    steps = 0
+
+    while frontier:
+        # If we reach the goal, return the number of steps
+        if frontier & goal_bit:
+            return steps
+
+        # Expand to all four neighbours, keeping only free cells not seen before
+        frontier = ((frontier << 1) | (frontier >> 1) | (frontier << stride) | (frontier >> stride)) & free & ~visited
+        visited |= frontier
+        steps += 1
+
+    return -1  # If no path found
+
 def bfs_shortest_path(grid, start, goal):
     """Finds the shortest path using BFS in the grid."""
     directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]
@@ -39,7 +126,7 @@ def bfs_shortest_path(grid, start, goal):
     return -1  # If no path found
 
 def find_blocking_byte(byte_positions, grid, grid_size, start_index):
-    """Finds the first byte that blocks the path to the exit."""
+    """Finds the first byte that blocks the path to the exit (a list of tuples or a CoordinateBuffer)."""
     start = (0, 0)
     goal = (grid_size - 1, grid_size - 1)
 
@@ -52,6 +139,174 @@ def find_blocking_byte(byte_positions, grid, grid_size, start_index):
 
     return None
 
+class DisjointSet:
+    """Union-find over cell indices with path halving and union by size."""
+
+    def __init__(self, size):
+        self.parent = list(range(size))
+        self.size = [1] * size
+
+    def find(self, item):
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+
+def find_blocking_byte_offline(byte_positions, grid, grid_size, start_index):
+    """
+    Finds the first byte that blocks the path to the exit, like find_blocking_byte.
+
+    Instead of a BFS per byte, all bytes are dropped at once and then removed again in
+    reverse order while a disjoint set joins the reopened cells to their open neighbours.
+    The first byte whose removal reconnects start and goal is the blocking one.
+    """
+    start = (0, 0)
+    goal = (grid_size - 1, grid_size - 1)
+    size = len(grid)
+    start_cell = start[1] * size + start[0]
+    goal_cell = goal[1] * size + goal[0]
+
+    # Index of the first drop of each cell still open in the grid (later drops are no-ops)
+    tail = byte_positions[start_index:]
+    first_drop = {}
+    for offset, (x, y) in enumerate(tail):
+        if grid[y][x] == 0:
+            first_drop.setdefault(y * size + x, offset)
+
+    # BFS never checks its own starting cell, so the start always counts as open
+    open_cells = bytearray(1 if cell == 0 else 0 for row in grid for cell in row)
+    for cell in first_drop:
+        open_cells[cell] = 0
+    open_cells[start_cell] = 1
+
+    cells = DisjointSet(size * size)
+
+    def reopen(cell):
+        open_cells[cell] = 1
+        x, y = cell % size, cell // size
+        if x > 0 and open_cells[cell - 1]:
+            cells.union(cell, cell - 1)
+        if x < size - 1 and open_cells[cell + 1]:
+            cells.union(cell, cell + 1)
+        if y > 0 and open_cells[cell - size]:
+            cells.union(cell, cell - size)
+        if y < size - 1 and open_cells[cell + size]:
+            cells.union(cell, cell + size)
+
+    for cell in range(size * size):
+        if open_cells[cell]:
+            reopen(cell)
+
+    def connected():
+        return open_cells[goal_cell] and cells.find(start_cell) == cells.find(goal_cell)
+
+    if start_cell == goal_cell or connected():
+        blocking = None
+    else:
+        # Already blocked before any tail byte drops unless a removal reconnects the grid
+        blocking = 0 if tail else None
+        for offset in range(len(tail) - 1, -1, -1):
+            x, y = tail[offset]
+            cell = y * size + x
+            if first_drop.get(cell) != offset or cell == start_cell:
+                continue
+            reopen(cell)
+            if connected():
+                blocking = offset
+                break
+
+    # Leave the grid in the same state find_blocking_byte would
+    end = len(tail) if blocking is None else blocking + 1
+    for x, y in tail[:end]:
+        grid[y][x] = 1
+
+    return None if blocking is None else tuple(tail[blocking])
+
+class PrefixDistanceIndex:
+    """
+    Answers "shortest path length after the first k bytes" for many k from one parse.
+
+    Each cell stores the index of the first byte that lands on it, so the grid after any
+    k bytes is implicit. A BFS for k also yields its path, which stays shortest for every
+    later k until a byte hits one of its cells; those intervals are reused across queries.
+    """
+
+    def __init__(self, byte_positions, grid_size, start=(0, 0), goal=None):
+        self.grid_size = grid_size
+        self.start = start
+        self.goal = goal if goal is not None else (grid_size - 1, grid_size - 1)
+        self.bfs_runs = 0
+
+        never = sys.maxsize
+        self.first_drop = array('q', [never]) * (grid_size * grid_size)
+        for index, (x, y) in enumerate(byte_positions):
+            cell = y * grid_size + x
+            if self.first_drop[cell] == never:
+                self.first_drop[cell] = index
+
+        # Known answers as sorted (first k, last k, steps) intervals
+        self.intervals = []
+
+    def _bfs(self, k):
+        """BFS on the grid after k bytes; returns (steps, path cells after the start)."""
+        size = self.grid_size
+        first_drop = self.first_drop
+        start = self.start[1] * size + self.start[0]
+        goal = self.goal[1] * size + self.goal[0]
+        parent = {start: None}
+        queue = deque([start])
+        self.bfs_runs += 1
+
+        while queue:
+            cell = queue.popleft()
+            if cell == goal:
+                path = []
+                while cell != start:
+                    path.append(cell)
+                    cell = parent[cell]
+                return len(path), path
+
+            x = cell % size
+            for neighbour, inside in ((cell + 1, x < size - 1), (cell - 1, x > 0),
+                                      (cell + size, cell + size < size * size), (cell - size, cell >= size)):
+                if inside and first_drop[neighbour] >= k and neighbour not in parent:
+                    parent[neighbour] = cell
+                    queue.append(neighbour)
+
+        return -1, None
+
+    def distance_after(self, k):
+        """Shortest path length after the first k bytes, or -1 if the exit is cut off."""
+        position = bisect_right(self.intervals, (k, sys.maxsize, sys.maxsize))
+        if position:
+            first, last, steps = self.intervals[position - 1]
+            if first <= k <= last:
+                return steps
+
+        steps, path = self._bfs(k)
+        if path is None:
+            last = sys.maxsize  # More bytes never reopen the exit
+        else:
+            # The path stays open (and shortest) until a byte lands on one of its cells
+            last = min((self.first_drop[cell] for cell in path), default=sys.maxsize)
+        insort(self.intervals, (k, last, steps))
+        return steps
+
+    def distances_after(self, ks):
+        """Answers a batch of k values in one call, in the order given."""
+        answers = {k: self.distance_after(k) for k in sorted(set(ks))}
+        return [answers[k] for k in ks]
+
 if __name__ == "__main__":
     # Input parameters
     file_path = "2024_day18_input.txt"  # Replace with your input file path
@@ -59,18 +314,19 @@ if __name__ == "__main__":
     num_bytes = 1024
 
     # Parse input and simulate falling bytes
-    byte_positions = parse_input(file_path)
-    grid = simulate_falling_bytes(byte_positions, grid_size, num_bytes)
+    byte_positions = load_coordinates(file_path)
+    rows = simulate_falling_bytes_bits(byte_positions, grid_size, num_bytes)
 
     # Find shortest path
     start = (0, 0)
     goal = (70, 70)
-    result = bfs_shortest_path(grid, start, goal)
+    result = bfs_shortest_path_bits(rows, start, goal)
 
     print(f"The minimum number of steps to reach the exit is: {result}")
 
     # Part 2: Find the first blocking byte after the first 1024 bytes
-    blocking_byte = find_blocking_byte(byte_positions, grid, grid_size, num_bytes)
+    grid = simulate_falling_bytes(byte_positions, grid_size, num_bytes)
+    blocking_byte = find_blocking_byte_offline(byte_positions, grid, grid_size, num_bytes)
     if blocking_byte:
         print(f"The first byte that blocks the path is: {blocking_byte[0]},{blocking_byte[1]}")
     else:
@@ -0,0 +1,85 @@
+import os
+import random
+import sys
+import tempfile
+import time
+
+from d18 import (PrefixDistanceIndex, bfs_shortest_path, bfs_shortest_path_bits, find_blocking_byte,
+                 find_blocking_byte_offline, load_coordinates, parse_input, simulate_falling_bytes,
+                 simulate_falling_bytes_bits)
+
+
+def random_bytes(grid_size, seed=18):
+    """Every cell except the corners, in random order, so the path is eventually blocked."""
+    cells = [(x, y) for y in range(grid_size) for x in range(grid_size)
+             if (x, y) not in ((0, 0), (grid_size - 1, grid_size - 1))]
+    random.Random(seed).shuffle(cells)
+    return cells
+
+
+def check_agreement(count=300, seed=18):
+    """
+    Asserts that the bit BFS, PrefixDistanceIndex and load_coordinates match the list BFS
+    and parse_input on random grids, byte orders (repeats included) and input files.
+    """
+    rng = random.Random(seed)
+    queries = 0
+    for _ in range(count):
+        grid_size = rng.randint(1, 24)
+        goal = (grid_size - 1, grid_size - 1)
+        byte_positions = [(rng.randrange(grid_size), rng.randrange(grid_size))
+                          for _ in range(rng.randint(0, grid_size * grid_size))]
+
+        ks = [rng.randint(0, len(byte_positions)) for _ in range(8)]
+        index = PrefixDistanceIndex(byte_positions, grid_size)
+        for k, distance in zip(ks, index.distances_after(ks)):
+            expected = bfs_shortest_path(simulate_falling_bytes(byte_positions, grid_size, k), (0, 0), goal)
+            rows = simulate_falling_bytes_bits(byte_positions, grid_size, k)
+            assert bfs_shortest_path_bits(rows, (0, 0), goal) == expected, f"bits, grid {grid_size}, k={k}"
+            assert distance == expected, f"prefix index, grid {grid_size}, k={k}: {distance} != {expected}"
+            queries += 1
+
+        # Small chunks so numbers land right at the chunk boundaries
+        text = "\n".join(f"{x},{y}" for x, y in byte_positions)
+        if text:
+            text += rng.choice(["", "\n"])
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+            f.write(text)
+        try:
+            expected = parse_input(f.name)
+            buffer = load_coordinates(f.name, chunk_size=rng.randint(1, 16))
+        finally:
+            os.unlink(f.name)
+        start, stop = sorted(rng.randint(0, len(expected)) for _ in range(2))
+        assert list(buffer) == expected and len(buffer) == len(expected), f"buffer, grid {grid_size}"
+        assert list(buffer[start:stop]) == expected[start:stop], f"buffer slice, grid {grid_size}"
+        if expected:
+            assert buffer[-1] == expected[-1], f"buffer index, grid {grid_size}"
+
+    print(f"Agreement: {queries:,} distance queries and {count:,} coordinate files match the reference")
+
+
+def bench(grid_size, num_bytes):
+    byte_positions = random_bytes(grid_size)
+
+    grid = simulate_falling_bytes(byte_positions, grid_size, num_bytes)
+    start = time.perf_counter()
+    expected = find_blocking_byte(byte_positions, grid, grid_size, num_bytes)
+    bfs_time = time.perf_counter() - start
+
+    grid = simulate_falling_bytes(byte_positions, grid_size, num_bytes)
+    start = time.perf_counter()
+    result = find_blocking_byte_offline(byte_positions, grid, grid_size, num_bytes)
+    offline_time = time.perf_counter() - start
+
+    assert result == expected, f"grid {grid_size}: {result} != {expected}"
+    print(f"grid {grid_size}x{grid_size}: BFS per byte {bfs_time:.3f}s | "
+          f"union-find {offline_time:.3f}s | speedup {bfs_time / offline_time:.1f}x")
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [31, 51, 71, 101]
+    check_agreement()
+    for grid_size in sizes:
+        # Same ratio as the puzzle: 1024 bytes on a 71x71 grid
+        bench(grid_size, grid_size * grid_size // 5)
@@ -1,4 +1,10 @@
-from collections import deque
+import hashlib
+import json
+import os
+from array import array
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
 
 def parse_input(file_path):
     """Parses the input file to get the towel patterns and desired designs."""
@@ -12,62 +18,406 @@ def parse_input(file_path):
 
     return patterns, designs
 
-def can_form_design(patterns, design):
-    """Checks if a design can be formed using the available patterns."""
-    # Convert patterns into a set for quick lookup
-    pattern_set = set(patterns)
-
-    # BFS to check if we can form the design
-    queue = deque([design])
-    visited = set()  # To avoid re-checking the same substring
+class PatternTrie:
+    """Trie over the towel patterns, built once and shared by every design."""
 
-    while queue:
-        current = queue.popleft()
+    def __init__(self, patterns):
+        self.children = [{}]  # Node 0 is the root
+        self.terminal = [False]  # Whether a pattern ends at this node
+        self.max_length = 0
+        for pattern in patterns:
+            node = 0
+            for char in pattern:
+                child = self.children[node].get(char)
+                if child is None:
+                    child = len(self.children)
+                    self.children[node][char] = child
+                    self.children.append({})
+                    self.terminal.append(False)
+                node = child
+            self.terminal[node] = True
+            self.max_length = max(self.max_length, len(pattern))
+        self.terminal[0] = False  # An empty pattern never advances a design
 
-        if not current:  # If empty, we successfully formed the design
-            return True
+    def match_lengths(self, design, start):
+        """Yields the length of every pattern that occurs in design at position start."""
+        children, terminal = self.children, self.terminal
+        node = 0
+        for index in range(start, len(design)):
+            node = children[node].get(design[index])
+            if node is None:
+                return
+            if terminal[node]:
+                yield index - start + 1
 
-        if current in visited:  # Skip already visited states
-            continue
-        visited.add(current)
+def can_form_design(patterns, design, trie=None):
+    """Checks if a design can be formed using the available patterns."""
+    if trie is None:
+        trie = PatternTrie(patterns)
 
-        for pattern in pattern_set:
-            if current.startswith(pattern):
-                queue.append(current[len(pattern):])
+    # Mark every position reachable by chaining patterns from the start
+    reachable = bytearray(len(design) + 1)
+    reachable[0] = 1
+    for i in range(len(design)):
+        if reachable[i]:
+            for length in trie.match_lengths(design, i):
+                reachable[i + length] = 1
 
-    return False
+    return bool(reachable[len(design)])
 
 def count_possible_designs(patterns, designs):
     """Counts how many designs can be formed with the available patterns."""
+    trie = PatternTrie(patterns)
     count = 0
     for design in designs:
-        if can_form_design(patterns, design):
+        if can_form_design(patterns, design, trie):
             count += 1
     return count
 
-def count_all_arrangements(patterns, design):
+def count_all_arrangements(patterns, design, trie=None):
     """Counts all possible arrangements to form a design using the available patterns."""
-    # Convert patterns into a set for quick lookup
-    pattern_set = set(patterns)
+    if trie is None:
+        trie = PatternTrie(patterns)
 
-    # Dynamic programming approach
+    # Dynamic programming approach: push the ways to reach i to every pattern matching at i
     dp = [0] * (len(design) + 1)
     dp[0] = 1  # Base case: one way to form an empty string
 
-    for i in range(1, len(design) + 1):
-        for pattern in pattern_set:
-            if design[:i].endswith(pattern):
-                dp[i] += dp[i - len(pattern)]
+    for i in range(len(design)):
+        if dp[i]:
+            for length in trie.match_lengths(design, i):
+                dp[i + length] += dp[i]
 
     return dp[len(design)]
 
+def count_arrangements_stream(patterns, chars, trie=None):
+    """
+    Counts all arrangements of a design read as a stream of characters (or string chunks).
+
+    Instead of a dp array over the whole design it keeps the partial matches in flight as
+    trie node -> number of ways; the root holds the ways to have formed everything so far.
+    Partial matches are never longer than the longest pattern, so memory stays
+    O(max pattern length) and the design is never sliced.
+    """
+    if trie is None:
+        trie = PatternTrie(patterns)
+    children, terminal = trie.children, trie.terminal
+
+    active = {0: 1}  # One way to form the empty prefix
+    for chunk in chars:
+        for char in chunk:
+            following = {}
+            completed = 0
+            for node, ways in active.items():
+                child = children[node].get(char)
+                if child is not None:
+                    following[child] = following.get(child, 0) + ways
+                    if terminal[child]:
+                        completed += ways
+            if completed:
+                following[0] = completed
+            if not following:
+                return 0  # No pattern can continue here
+            active = following
+
+    return active.get(0, 0)
+
 def sum_all_arrangements(patterns, designs):
     """Sums up all possible arrangements for all designs."""
+    trie = PatternTrie(patterns)
     total_arrangements = 0
     for design in designs:
-        total_arrangements += count_all_arrangements(patterns, design)
+        total_arrangements += count_all_arrangements(patterns, design, trie)
     return total_arrangements
 
+class TowelIndex:
+    """
+    Reusable index over the patterns with a memo of suffix -> arrangement counts.
+
+    The memo is shared by every design passed in, so tails common to many designs are
+    only counted once. It stores the suffixes of designs up to max_key_length characters,
+    each with the counts of its first max pattern length positions, which is all the
+    positions in front of it need. Longer designs would pay for quadratic key slicing,
+    so they bypass the memo and use the plain trie DP. maxsize bounds the number of
+    entries (not bytes) with LRU eviction (None keeps everything), and feasibility is
+    just a non-zero count, so one pass answers both parts.
+    """
+
+    def __init__(self, patterns, maxsize=100_000, max_key_length=256):
+        self.trie = PatternTrie(patterns)
+        self.maxsize = maxsize
+        self.max_key_length = max_key_length
+        self.window = max(self.trie.max_length, 1)
+        self.memo = OrderedDict()
+        self.hits = 0  # Designs answered fully or partly from the memo
+        self.misses = 0  # Designs counted from scratch
+        self.bypassed = 0  # Designs longer than max_key_length
+        self.probes = 0  # Individual suffix lookups
+        self.evictions = 0
+
+    def _lookup(self, key):
+        """Returns the memoized count window of a suffix, or None."""
+        self.probes += 1
+        window = self.memo.get(key)
+        if window is not None:
+            self.memo.move_to_end(key)
+        return window
+
+    def _store(self, key, window):
+        """Memoizes a count window, evicting the least recently used entry when full."""
+        memo = self.memo
+        memo[key] = window
+        if self.maxsize is not None and len(memo) > self.maxsize:
+            memo.popitem(last=False)
+            self.evictions += 1
+
+    def arrangements(self, design):
+        """Counts the arrangements of one design, reusing and filling the suffix memo."""
+        n = len(design)
+        if n > self.max_key_length:
+            self.bypassed += 1
+            return count_all_arrangements(None, design, self.trie)
+
+        # Probe the suffixes from the longest down and stop at the first hit: its window
+        # holds every count the positions in front of it depend on
+        counts = [0] * (n + 1)
+        counts[n] = 1  # One way to form the empty suffix
+        known = n
+        for i in range(n):
+            window = self._lookup(design[i:])
+            if window is not None:
+                counts[i:i + len(window)] = window
+                known = i
+                break
+
+        if known == 0:
+            self.hits += 1
+            return counts[0]
+        if known < n:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+        # Fill from there towards the start so every suffix a pattern leads to is known
+        for i in range(known - 1, -1, -1):
+            counts[i] = sum(counts[i + length] for length in self.trie.match_lengths(design, i))
+            self._store(design[i:], tuple(counts[i:i + self.window]))
+
+        return counts[0]
+
+    def can_form(self, design):
+        """Checks if a design can be formed, from the same memo as the counts."""
+        return self.arrangements(design) > 0
+
+    def analyze(self, designs):
+        """Returns (number of possible designs, total arrangements) in a single pass."""
+        possible_count = 0
+        total_arrangements = 0
+        for design in designs:
+            count = self.arrangements(design)
+            possible_count += count > 0
+            total_arrangements += count
+        return possible_count, total_arrangements
+
+    def stats(self):
+        """Per-design hit/miss statistics of the suffix memo."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "probes": self.probes,
+            "evictions": self.evictions,
+            "size": len(self.memo),
+            "maxsize": self.maxsize,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+class DesignDFA:
+    """
+    Deterministic automaton that accepts exactly the concatenations of the patterns.
+
+    Transitions live in one flat array('i') indexed by state * len(alphabet) + column,
+    with -1 as the dead state, so checking a design is a single scan without allocation.
+    """
+
+    def __init__(self, alphabet, transitions, accepting):
+        self.alphabet = alphabet
+        self.columns = {char: column for column, char in enumerate(alphabet)}
+        self.transitions = array('i', transitions)
+        self.accepting = bytearray(accepting)
+
+    @classmethod
+    def from_patterns(cls, patterns, minimize=True):
+        """Builds the automaton by subset construction over the pattern trie."""
+        trie = PatternTrie(patterns)
+        alphabet = ''.join(sorted({char for pattern in patterns for char in pattern}))
+
+        # A DFA state is the set of trie nodes the design could currently be in;
+        # whenever a pattern completes, the next one may start from the root
+        start = frozenset([0])
+        states = {start: 0}
+        queue = [start]
+        transitions = []
+        accepting = []
+        for nodes in queue:
+            accepting.append(0 in nodes)
+            for char in alphabet:
+                following = {trie.children[node][char] for node in nodes if char in trie.children[node]}
+                if not following:
+                    transitions.append(-1)
+                    continue
+                if any(trie.terminal[node] for node in following):
+                    following.add(0)
+                following = frozenset(following)
+                if following not in states:
+                    states[following] = len(states)
+                    queue.append(following)
+                transitions.append(states[following])
+
+        dfa = cls(alphabet, transitions, accepting)
+        return dfa.minimized() if minimize else dfa
+
+    def minimized(self):
+        """Merges equivalent states by partition refinement (Moore's algorithm)."""
+        width = len(self.alphabet)
+        count = len(self.accepting)
+        block = list(self.accepting)
+        while True:
+            signatures = {}
+            refined = []
+            for state in range(count):
+                targets = self.transitions[state * width:(state + 1) * width]
+                signature = (block[state],) + tuple(block[t] if t >= 0 else -1 for t in targets)
+                refined.append(signatures.setdefault(signature, len(signatures)))
+            if len(signatures) == len(set(block)):
+                break
+            block = refined
+
+        # Renumber so the start state stays 0
+        order = {}
+        for state in range(count):
+            order.setdefault(refined[state], len(order))
+        representatives = {}
+        for state in range(count):
+            representatives.setdefault(order[refined[state]], state)
+
+        transitions = []
+        accepting = []
+        for new_state in range(len(order)):
+            state = representatives[new_state]
+            accepting.append(self.accepting[state])
+            for t in self.transitions[state * width:(state + 1) * width]:
+                transitions.append(order[refined[t]] if t >= 0 else -1)
+        return DesignDFA(self.alphabet, transitions, accepting)
+
+    def accepts(self, design):
+        """Checks if a design can be formed, in one pass over its characters."""
+        columns = self.columns
+        transitions = self.transitions
+        width = len(self.alphabet)
+        state = 0
+        for char in design:
+            column = columns.get(char)
+            if column is None:
+                return False
+            state = transitions[state * width + column]
+            if state < 0:
+                return False
+        return bool(self.accepting[state])
+
+    def save(self, path):
+        """Writes the automaton to disk as JSON."""
+        with open(path, 'w') as f:
+            json.dump({"alphabet": self.alphabet,
+                       "transitions": self.transitions.tolist(),
+                       "accepting": list(self.accepting)}, f, separators=(',', ':'))
+
+    @classmethod
+    def load(cls, path):
+        """Reads an automaton written by save."""
+        with open(path, 'r') as f:
+            data = json.load(f)
+        return cls(data["alphabet"], data["transitions"], data["accepting"])
+
+def compile_design_dfa(patterns, minimize=True, cache_dir=None):
+    """Builds the DesignDFA for the patterns, loading and storing it in cache_dir if given."""
+    if cache_dir is None:
+        return DesignDFA.from_patterns(patterns, minimize)
+
+    key = hashlib.sha256(("\n".join(sorted(set(patterns))) + f"\n{minimize}").encode()).hexdigest()
+    path = os.path.join(cache_dir, f"d19-dfa-{key[:16]}.json")
+    if os.path.exists(path):
+        return DesignDFA.load(path)
+
+    dfa = DesignDFA.from_patterns(patterns, minimize)
+    os.makedirs(cache_dir, exist_ok=True)
+    dfa.save(path)
+    return dfa
+
+def read_patterns(file_path):
+    """Reads only the towel patterns from the first line of the input file."""
+    with open(file_path, 'r') as f:
+        return f.readline().strip().split(', ')
+
+def iter_designs(file_path):
+    """Lazily yields the designs listed after the blank line of the input file."""
+    with open(file_path, 'r') as f:
+        for line in f:
+            if not line.strip():
+                break
+        for line in f:
+            design = line.strip()
+            if design:
+                yield design
+
+def chunked(iterable, size):
+    """Groups an iterable into lists of at most size items."""
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+# Per-process towel index, built once by the pool initializer
+_worker_index = None
+
+def _init_worker(patterns, maxsize):
+    global _worker_index
+    _worker_index = TowelIndex(patterns, maxsize)
+
+def _analyze_chunk(designs):
+    return _worker_index.analyze(designs)
+
+def stream_totals(file_path, workers=None, chunk_size=1000, maxsize=100_000):
+    """
+    Computes (possible designs, total arrangements) for arbitrarily large design files.
+
+    Designs are read lazily in chunks and fanned out to a process pool whose workers
+    each build their own TowelIndex once. At most two chunks per worker are in flight,
+    so memory stays bounded by the chunk size rather than the file size.
+    """
+    workers = workers or os.cpu_count() or 1
+    patterns = read_patterns(file_path)
+    possible_count = 0
+    total_arrangements = 0
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(patterns, maxsize)) as pool:
+        pending = set()
+        for chunk in chunked(iter_designs(file_path), chunk_size):
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    possible, arrangements = future.result()
+                    possible_count += possible
+                    total_arrangements += arrangements
+            pending.add(pool.submit(_analyze_chunk, chunk))
+
+        for future in pending:
+            possible, arrangements = future.result()
+            possible_count += possible
+            total_arrangements += arrangements
+
+    return possible_count, total_arrangements
+
 if __name__ == "__main__":
     file_path = "2024_day19_input.txt"
 
@@ -76,8 +426,12 @@ if __name__ == "__main__":
     print(f"Patterns: {patterns}")
     print(f"Designs: {designs}")
 
-    possible_count = count_possible_designs(patterns, designs)
-    print(f"Number of possible designs: {possible_count}")
+    # Screen designs with the automaton; only feasible ones need the counting DP
+    design_dfa = compile_design_dfa(patterns)
+    feasible_designs = [design for design in designs if design_dfa.accepts(design)]
 
-    total_arrangements = sum_all_arrangements(patterns, designs)
+    towel_index = TowelIndex(patterns)
+    possible_count, total_arrangements = towel_index.analyze(feasible_designs)
+    print(f"Number of possible designs: {possible_count}")
     print(f"Total number of arrangements: {total_arrangements}")
+    print(f"Suffix cache: {towel_index.stats()}")
@@ -1,4 +1,14 @@
+import os
+from array import array
 from collections import deque, defaultdict, Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import cache
+from multiprocessing import shared_memory
+
+try:
+    import numpy as np
+except ImportError:  # The vectorized counter falls back to plain Python
+    np = None
 
 def parse_input(file_path):
     """Parses the input file to extract the grid, start, and end positions."""
@@ -40,23 +50,59 @@ def bfs_from_point(grid, start, end=None):
 
     return distances
 
-def precompute_bfs(grid, end):
-    """Precomputes BFS distances for all track positions."""
-    bfs_distances = {}
-    for y, row in enumerate(grid):
-        for x, cell in enumerate(row):
-            if cell != '#':
-                bfs_distances[(x, y)] = bfs_from_point(grid, (x, y), end=end)
-    return bfs_distances
+def distance_field(grid, source):
+    """
+    BFS from source into a flat array indexed by y * width + x (-1 where unreachable).
 
-def find_shortest_path(grid, start, end, bfs_distances):
-    """Finds the shortest path from start to end using precomputed BFS distances."""
-    return bfs_distances[start].get(end, float('inf'))
+    Also returns the flat indices in the order BFS visited them.
+    """
+    width, height = len(grid[0]), len(grid)
+    distances = array('i', [-1]) * (width * height)
+    sx, sy = source
+    distances[sy * width + sx] = 0
+    order = [sy * width + sx]
 
-def simulate_cheats(grid, path, bfs_distances, min_savings):
-    """Simulates cheats along the shortest path to evaluate possible savings."""
+    for cell in order:
+        x, y = cell % width, cell // width
+        dist = distances[cell] + 1
+        for nx, ny in ((x, y + 1), (x + 1, y), (x, y - 1), (x - 1, y)):
+            if 0 <= nx < width and 0 <= ny < height and grid[ny][nx] != '#':
+                neighbour = ny * width + nx
+                if distances[neighbour] < 0:
+                    distances[neighbour] = dist
+                    order.append(neighbour)
+
+    return distances, order
+
+class DistanceFields:
+    """Distances from the start and to the end for every cell, from one BFS each."""
+
+    def __init__(self, grid, start, end):
+        self.width = len(grid[0])
+        self.height = len(grid)
+        self.start = start
+        self.end = end
+        self.from_start, self.order = distance_field(grid, start)
+        self.to_end, _ = distance_field(grid, end)
+
+    def path(self):
+        """Track positions reachable from the start, in BFS order from the start."""
+        width = self.width
+        return [(cell % width, cell // width) for cell in self.order]
+
+def precompute_distance_fields(grid, start, end):
+    """Precomputes the distance fields from the start and to the end."""
+    return DistanceFields(grid, start, end)
+
+def find_shortest_path(grid, start, end, fields):
+    """Finds the shortest path from start to end using the precomputed distance fields."""
+    dist = fields.from_start[end[1] * fields.width + end[0]]
+    return dist if dist >= 0 else float('inf')
+
+def iter_cheats(grid, path, fields, min_savings):
+    """Yields the cheats along the shortest path one at a time, as (savings, start, end)."""
     directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]
-    cheats = []
+    width, to_end, end = fields.width, fields.to_end, fields.end
 
     for i, (x, y) in enumerate(path):
         for dx1, dy1 in directions:
@@ -67,32 +113,218 @@ def simulate_cheats(grid, path, bfs_distances, min_savings):
                 # Ensure we end back on a track position or exactly at the end
                 if 0 <= nx < len(grid[0]) and 0 <= ny < len(grid) and (grid[ny][nx] == '.' or (nx, ny) == end):
                     # Calculate the new path length using the cheat
-                    remaining_path_length = bfs_distances[(nx, ny)].get(end, float('inf'))
-                    if remaining_path_length < float('inf'):
+                    remaining_path_length = to_end[ny * width + nx]
+                    if remaining_path_length >= 0:
                         cheat_savings = len(path) - (i + 1 + cheat_length + remaining_path_length)
                         if cheat_savings >= min_savings:
-                            cheats.append((cheat_savings, (x, y), (nx, ny)))
+                            yield cheat_savings, (x, y), (nx, ny)
 
-    return cheats
+def simulate_cheats(grid, path, fields, min_savings):
+    """Simulates cheats along the shortest path to evaluate possible savings."""
+    return list(iter_cheats(grid, path, fields, min_savings))
 
-def simulate_cheats_part2(grid, path, bfs_distances, min_savings):
-    """Simulates cheats for part 2 (up to 20 picoseconds) along the shortest path."""
-    cheats = []
+@cache
+def diamond_offsets(radius):
+    """All (dx, dy, distance) offsets within the given Manhattan radius."""
+    return tuple((dx, dy, abs(dx) + abs(dy))
+                 for dy in range(-radius, radius + 1)
+                 for dx in range(-(radius - abs(dy)), radius - abs(dy) + 1))
 
-    def manhattan_distance(p1, p2):
-        return abs(p1[0] - p2[0]) + abs(p1[1] - p2[1])
+def iter_cheats_part2(path, fields, min_savings, radius=20):
+    """Yields the part 2 cheats (up to radius picoseconds) one at a time, as (savings, start, end)."""
+    width, height, to_end = fields.width, fields.height, fields.to_end
+    offsets = diamond_offsets(radius)
 
+    # Only the cells inside the cheat diamond around each path position can be reached
     for i, (x, y) in enumerate(path):
-        for end_x, end_y in bfs_distances:
-            if manhattan_distance((x, y), (end_x, end_y)) <= 20:
-                if grid[end_y][end_x] != '#':  # End point must not be a wall
-                    remaining_path_length = bfs_distances[(end_x, end_y)].get(end, float('inf'))
-                    if remaining_path_length < float('inf'):
-                        cheat_savings = len(path) - (i + 1 + manhattan_distance((x, y), (end_x, end_y)) + remaining_path_length)
-                        if cheat_savings >= min_savings:
-                            cheats.append((cheat_savings, (x, y), (end_x, end_y)))
+        for dx, dy, distance in offsets:
+            end_x, end_y = x + dx, y + dy
+            if 0 <= end_x < width and 0 <= end_y < height:
+                remaining_path_length = to_end[end_y * width + end_x]
+                if remaining_path_length >= 0:  # Not a wall and connected to the end
+                    cheat_savings = len(path) - (i + 1 + distance + remaining_path_length)
+                    if cheat_savings >= min_savings:
+                        yield cheat_savings, (x, y), (end_x, end_y)
+
+def simulate_cheats_part2(grid, path, fields, min_savings, radius=20):
+    """Simulates cheats for part 2 (up to 20 picoseconds) along the shortest path."""
+    return list(iter_cheats_part2(path, fields, min_savings, radius))
+
+def tally_cheats(cheats, path_length):
+    """
+    Aggregates cheats into a fixed-size histogram: entry s counts the cheats saving s.
+
+    Savings never exceed the path length, so memory stays at path_length + 1 integers
+    however many cheats the (lazy) iterable produces; sum() gives the plain count.
+    """
+    histogram = array('q', [0]) * (path_length + 1)
+    for cheat_savings, _, _ in cheats:
+        if cheat_savings < 0:
+            raise ValueError("tally_cheats only counts cheats that save time")
+        histogram[cheat_savings] += 1
+    return histogram
+
+def _path_positions(path, fields):
+    """2D numpy array with each cell's index in the path (-1 off the path)."""
+    width, height = fields.width, fields.height
+    position = np.full(width * height, -1, dtype=np.int64)
+    position[[y * width + x for x, y in path]] = np.arange(len(path))
+    return position.reshape(height, width)
+
+def _offset_savings(position, to_end, path_length, dx, dy, distance):
+    """Savings of every cheat jumping by (dx, dy), evaluated over the whole grid at once."""
+    height, width = position.shape
+    # Overlapping windows of cheat starts and the cells (dx, dy) away from them
+    x0, x1 = max(0, -dx), min(width, width - dx)
+    y0, y1 = max(0, -dy), min(height, height - dy)
+    if x0 >= x1 or y0 >= y1:
+        return np.empty(0, dtype=np.int64)
+    starts = position[y0:y1, x0:x1]
+    remaining = to_end[y0 + dy:y1 + dy, x0 + dx:x1 + dx]
+    savings = path_length - (starts + 1 + distance + remaining)
+    return savings[(starts >= 0) & (remaining >= 0)]
+
+def cheat_savings_histogram(path, fields, min_savings, radius=20):
+    """
+    Counts part 2 cheats by savings without listing them, in the same array('q') layout
+    as tally_cheats: entry s counts the cheats saving s.
+
+    With numpy, the whole grid is evaluated per diamond offset in one vectorized pass,
+    so the cost is O(radius^2 * grid cells) instead of growing with path length squared.
+    """
+    if min_savings < 0:
+        raise ValueError("cheat_savings_histogram only counts cheats that save time")
+    if np is None:
+        return tally_cheats(iter_cheats_part2(path, fields, min_savings, radius), len(path))
+
+    position = _path_positions(path, fields)
+    to_end = np.frombuffer(fields.to_end, dtype=np.int32).reshape(fields.height, fields.width).astype(np.int64)
+
+    # Savings never exceed the path length
+    counts = np.zeros(len(path) + 1, dtype=np.int64)
+    for dx, dy, distance in diamond_offsets(radius):
+        savings = _offset_savings(position, to_end, len(path), dx, dy, distance)
+        counts += np.bincount(savings[savings >= min_savings], minlength=len(counts))
+
+    return array('q', counts.tolist())
+
+class CheatIndex:
+    """
+    Answers cheat counts for any (max cheat length, min savings) pair from one build.
+
+    Cheats follow the part 2 model (any cell within Manhattan distance max_length). The
+    build histograms the savings per exact cheat length once, then turns them into
+    cumulative tables: table[r][s] is the number of cheats of length <= r saving >= s.
+    """
+
+    def __init__(self, path, fields, max_radius=20):
+        self.max_radius = max_radius
+        self.path_length = len(path)
+        size = len(path) + 1  # Savings range from 0 to len(path)
+
+        by_length = [array('q', [0]) * size for _ in range(max_radius + 1)]
+        if np is not None:
+            position = _path_positions(path, fields)
+            to_end = np.frombuffer(fields.to_end, dtype=np.int32).reshape(fields.height, fields.width).astype(np.int64)
+            for dx, dy, distance in diamond_offsets(max_radius):
+                savings = _offset_savings(position, to_end, len(path), dx, dy, distance)
+                counts = np.bincount(savings[savings >= 0], minlength=size)
+                row = by_length[distance]
+                for value in np.flatnonzero(counts):
+                    row[value] += int(counts[value])
+        else:
+            for cheat_savings, (x, y), (end_x, end_y) in iter_cheats_part2(path, fields, 0, max_radius):
+                by_length[abs(end_x - x) + abs(end_y - y)][cheat_savings] += 1
+
+        # Cumulative over savings (from the top) and then over cheat length
+        self.table = []
+        running = array('q', [0]) * (size + 1)
+        for row in by_length:
+            at_least = 0
+            cumulative = array('q', [0]) * (size + 1)
+            for value in range(size - 1, -1, -1):
+                at_least += row[value]
+                cumulative[value] = running[value] + at_least
+            self.table.append(cumulative)
+            running = cumulative
+
+    def count(self, max_length, min_savings):
+        """Number of cheats of length at most max_length saving at least min_savings."""
+        if not 0 <= max_length <= self.max_radius:
+            raise ValueError(f"max_length must be between 0 and {self.max_radius}")
+        if min_savings < 0:
+            raise ValueError("CheatIndex only tracks cheats that save time")
+        return self.table[max_length][min(min_savings, self.path_length + 1)]
+
+    def sweep(self, max_lengths, min_savings_values):
+        """Counts for every combination, as {(max_length, min_savings): count}."""
+        return {(max_length, min_savings): self.count(max_length, min_savings)
+                for max_length in max_lengths for min_savings in min_savings_values}
+
+# Per-process views on the shared distance field and path, set by _attach_shared
+_shared = {}
+
+def _attach_shared(field_name, path_name, width, height, path_length):
+    for key, name in (("field", field_name), ("path", path_name)):
+        block = shared_memory.SharedMemory(name=name)
+        _shared[key + "_block"] = block
+        _shared[key] = block.buf.cast('i')
+    _shared.update(width=width, height=height, path_length=path_length)
+
+def _scan_segment(begin, end, radius, min_savings):
+    """Histograms the part 2 cheats starting at path positions begin..end-1."""
+    to_end, path = _shared["field"], _shared["path"]
+    width, height, path_length = _shared["width"], _shared["height"], _shared["path_length"]
+    histogram = array('q', [0]) * (path_length + 1)
+
+    for i in range(begin, end):
+        x, y = path[i] % width, path[i] // width
+        for dx, dy, distance in diamond_offsets(radius):
+            end_x, end_y = x + dx, y + dy
+            if 0 <= end_x < width and 0 <= end_y < height:
+                remaining_path_length = to_end[end_y * width + end_x]
+                if remaining_path_length >= 0:
+                    cheat_savings = path_length - (i + 1 + distance + remaining_path_length)
+                    if cheat_savings >= min_savings:
+                        histogram[cheat_savings] += 1
+
+    return histogram
+
+def parallel_cheat_histogram(path, fields, min_savings, radius=20, workers=None, segments_per_worker=4):
+    """
+    Histograms the part 2 cheats like tally_cheats(iter_cheats_part2(...)), on a process pool.
+
+    The distance field to the end (which also marks walls with -1) and the path cells are
+    placed in shared memory once; each worker attaches to them and scans a segment of the
+    path, and the per-segment histograms are summed.
+    """
+    if min_savings < 0:
+        raise ValueError("parallel_cheat_histogram only counts cheats that save time")
+    workers = workers or os.cpu_count() or 1
+    path_cells = array('i', (y * fields.width + x for x, y in path))
+
+    blocks = []
+    try:
+        for data in (fields.to_end, path_cells):
+            block = shared_memory.SharedMemory(create=True, size=max(1, len(data) * data.itemsize))
+            block.buf[:len(data) * data.itemsize] = data.tobytes()
+            blocks.append(block)
+
+        segment = max(1, -(-len(path) // (workers * segments_per_worker)))
+        bounds = [(begin, min(begin + segment, len(path))) for begin in range(0, len(path), segment)]
 
-    return cheats
+        histogram = array('q', [0]) * (len(path) + 1)
+        initargs = (blocks[0].name, blocks[1].name, fields.width, fields.height, len(path))
+        with ProcessPoolExecutor(workers, initializer=_attach_shared, initargs=initargs) as pool:
+            futures = [pool.submit(_scan_segment, begin, end, radius, min_savings) for begin, end in bounds]
+            for future in futures:
+                for cheat_savings, count in enumerate(future.result()):
+                    histogram[cheat_savings] += count
+        return histogram
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
 
 def print_grid(grid, path=None):
     """Prints the grid optionally overlaying a path."""
@@ -106,7 +338,7 @@ def print_grid(grid, path=None):
         print(''.join(row))
 
 def count_cheats_by_length(cheats):
-    """Counts the cheats grouped by their savings length."""
+    """Counts the cheats (a list or any iterable of them) grouped by their savings length."""
     savings_counter = Counter(cheat[0] for cheat in cheats)
     for savings, count in sorted(savings_counter.items()):
         print(f"Cheats saving {savings} picoseconds: {count}")
@@ -118,30 +350,33 @@ if __name__ == "__main__":
     # Parse the input
     grid, start, end = parse_input(file_path)
 
-    # Precompute BFS distances for all non-wall positions
-    bfs_distances = precompute_bfs(grid, end)
+    # Precompute distances from the start and to the end for every position
+    fields = precompute_distance_fields(grid, start, end)
+    path = fields.path()
 
     # Find the baseline shortest path
-    shortest_path_length = find_shortest_path(grid, start, end, bfs_distances)
+    shortest_path_length = find_shortest_path(grid, start, end, fields)
     print(f"Baseline shortest path length: {shortest_path_length}")
 
-    # Simulate cheats and find those with at least the minimum savings
-    cheats = simulate_cheats(grid, bfs_distances[start], bfs_distances, min_savings)
-    print(f"Number of cheats saving at least {min_savings} picoseconds: {len(cheats)}")
+    # Count the cheats with at least the minimum savings without keeping them
+    savings_part1 = tally_cheats(iter_cheats(grid, path, fields, min_savings), len(path))
+    print(f"Number of cheats saving at least {min_savings} picoseconds: {sum(savings_part1)}")
 
     # Count cheats grouped by their savings length
     # print("Cheats grouped by savings:")
-    # count_cheats_by_length(cheats)
+    # count_cheats_by_length(iter_cheats(grid, path, fields, min_savings))
 
-    # Simulate cheats for part 2
-    cheats_part2 = simulate_cheats_part2(grid, bfs_distances[start], bfs_distances, min_savings)
-    print(f"Number of cheats saving at least {min_savings} picoseconds (Part 2): {len(cheats_part2)}")
+    # Count cheats for part 2 by savings without listing them
+    savings_part2 = cheat_savings_histogram(path, fields, min_savings)
+    print(f"Number of cheats saving at least {min_savings} picoseconds (Part 2): {sum(savings_part2)}")
 
     # Count cheats grouped by their savings length (Part 2)
     # print("Cheats grouped by savings (Part 2):")
-    # count_cheats_by_length(cheats_part2)
+    # for savings, count in enumerate(savings_part2):
+    #     if count:
+    #         print(f"Cheats saving {savings} picoseconds: {count}")
 
 
     # Example usage of print_grid
     # print("Grid with shortest path:")
-    # print_grid(grid, path=bfs_distances[start])
+    # print_grid(grid, path=path)
@@ -0,0 +1,46 @@
+import os
+import sys
+import time
+
+from d20 import iter_cheats_part2, parallel_cheat_histogram, precompute_distance_fields, tally_cheats
+
+
+def serpentine_track(width, lanes):
+    """A single race track snaking through the grid, separated from itself by one wall."""
+    height = 2 * lanes + 1
+    grid = [['#'] * width for _ in range(height)]
+    for lane in range(lanes):
+        y = 2 * lane + 1
+        for x in range(1, width - 1):
+            grid[y][x] = '.'
+        if lane < lanes - 1:
+            # Connect to the next lane at alternating ends
+            grid[y + 1][width - 2 if lane % 2 == 0 else 1] = '.'
+    start = (1, 1)
+    end = (1 if lanes % 2 == 0 else width - 2, 2 * lanes - 1)
+    grid[start[1]][start[0]] = 'S'
+    grid[end[1]][end[0]] = 'E'
+    return grid, start, end
+
+
+if __name__ == "__main__":
+    width = int(sys.argv[1]) if len(sys.argv) > 1 else 201
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    min_savings = 100
+
+    grid, start, end = serpentine_track(width, width // 2)
+    fields = precompute_distance_fields(grid, start, end)
+    path = fields.path()
+    print(f"Track of {len(path):,} cells on a {len(grid[0])}x{len(grid)} grid")
+
+    start_time = time.perf_counter()
+    expected = tally_cheats(iter_cheats_part2(path, fields, min_savings), len(path))
+    serial_time = time.perf_counter() - start_time
+    print(f"serial: {serial_time:.2f}s, {sum(expected):,} cheats")
+
+    for workers in range(1, max_workers + 1):
+        start_time = time.perf_counter()
+        histogram = parallel_cheat_histogram(path, fields, min_savings, workers=workers)
+        elapsed = time.perf_counter() - start_time
+        assert histogram == expected, f"{workers} workers: histogram differs from the serial scan"
+        print(f"{workers} worker(s): {elapsed:.2f}s | speedup {serial_time / elapsed:.2f}x")
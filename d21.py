@@ -1,4 +1,8 @@
+import json
+import os
 import sys
+from collections import Counter, OrderedDict
+from fractions import Fraction
 from functools import cache
 from itertools import permutations
 
@@ -38,6 +42,14 @@ DIR_KEYPAD = {
     if char != ' '
 }
 
+# Position of the missing key on each keypad
+NUM_GAP = (0, 3)
+DIR_GAP = (0, 0)
+
+# Sets of valid positions for O(1) membership tests
+NUM_POSITIONS = frozenset(NUM_KEYPAD.values())
+DIR_POSITIONS = frozenset(DIR_KEYPAD.values())
+
 # Movement vectors for each direction character
 MOVES = {
     '^': (0, -1),
@@ -70,6 +82,7 @@ def compute_keypresses(
     """
     # Choose the appropriate keypad map
     keypad_map = DIR_KEYPAD if using_dir_pad else NUM_KEYPAD
+    key_positions = DIR_POSITIONS if using_dir_pad else NUM_POSITIONS
 
     # If nothing left to process, no presses are needed.
     if not char_sequence:
@@ -115,7 +128,7 @@ def compute_keypresses(
                 test_y += my
 
                 # If we leave the keypad, this permutation fails
-                if (test_x, test_y) not in keypad_map.values():
+                if (test_x, test_y) not in key_positions:
                     valid_path = False
                     break
 
@@ -146,10 +159,341 @@ def compute_keypresses(
     )
 
 
-def solve(lines: list[str]) -> None:
+# From this depth on, the best ordering of every directional move no longer changes,
+# so deeper costs follow a fixed linear map over key-pair transition counts
+LINEAR_FROM_DEPTH = 16
+
+
+def candidate_moves(
+        keypad_map: dict[str, tuple[int, int]],
+        gap: tuple[int, int],
+        from_key: str,
+        to_key: str
+) -> list[str]:
+    """
+    Return the move orderings between two keys that can be optimal.
+
+    Repeating a direction is free one level up, so only "all horizontal steps, then all
+    vertical ones" and the reverse are candidates; an ordering whose corner is the gap
+    is dropped.
+    """
+    from_x, from_y = keypad_map[from_key]
+    to_x, to_y = keypad_map[to_key]
+    horizontal = ('>' if to_x > from_x else '<') * abs(to_x - from_x)
+    vertical = ('v' if to_y > from_y else '^') * abs(to_y - from_y)
+
+    candidates = []
+    if (to_x, from_y) != gap:
+        candidates.append(horizontal + vertical)
+    if (from_x, to_y) != gap and vertical + horizontal not in candidates:
+        candidates.append(vertical + horizontal)
+    return candidates
+
+
+def key_pairs(char_sequence: str) -> Counter:
+    """
+    Count the (from_key, to_key) transitions needed to type a sequence, starting from 'A'.
+    """
+    return Counter(zip('A' + char_sequence, char_sequence))
+
+
+def sequence_cost(char_sequence: str, pair_costs: dict[tuple[str, str], int]) -> int:
+    """
+    Total cost of typing a sequence (starting from 'A') given the cost of every key pair.
+    """
+    return sum(pair_costs[pair] for pair in zip('A' + char_sequence, char_sequence))
+
+
+def move_cost_table(
+        keypad_map: dict[str, tuple[int, int]],
+        gap: tuple[int, int],
+        directional_costs: dict[tuple[str, str], int] | None
+) -> dict[tuple[str, str], int]:
+    """
+    Cost of moving between every two keys of a keypad and pressing the second one.
+
+    directional_costs are the pair costs of the directional keypad one robot up, or None
+    when a human presses this keypad directly.
+    """
+    table = {}
+    for from_key in keypad_map:
+        for to_key in keypad_map:
+            candidates = candidate_moves(keypad_map, gap, from_key, to_key)
+            if directional_costs is None:
+                table[(from_key, to_key)] = len(candidates[0]) + 1
+            else:
+                table[(from_key, to_key)] = min(
+                    sequence_cost(moves + 'A', directional_costs) for moves in candidates
+                )
+    return table
+
+
+def build_cost_tables(max_depth: int) -> list[dict[tuple[str, str], int]]:
+    """
+    Fill the directional cost tables bottom-up: tables[depth][(from_key, to_key)] is the
+    cost of that move plus press with depth robots above it.
+    """
+    tables = [move_cost_table(DIR_KEYPAD, DIR_GAP, None)]
+    for _ in range(max_depth):
+        tables.append(move_cost_table(DIR_KEYPAD, DIR_GAP, tables[-1]))
+    return tables
+
+
+@cache
+def transition_map() -> dict[tuple[str, str], Counter]:
+    """
+    Build the linear map on directional key pairs.
+
+    Each pair expands into the key pairs of its best move ordering (plus 'A') one robot
+    further up; the orderings are read off the bottom-up cost table one level below
+    LINEAR_FROM_DEPTH, so compute_keypresses stays a reference only.
+    """
+    costs_above = build_cost_tables(LINEAR_FROM_DEPTH - 1)[-1]
+    transitions = {}
+    for from_key in DIR_KEYPAD:
+        for to_key in DIR_KEYPAD:
+            best = min(
+                candidate_moves(DIR_KEYPAD, DIR_GAP, from_key, to_key),
+                key=lambda moves: sequence_cost(moves + 'A', costs_above)
+            )
+            transitions[(from_key, to_key)] = key_pairs(best + 'A')
+    return transitions
+
+
+def _solve_combination(vectors: list[list[int]], target: list[int]) -> list[int] | None:
+    """
+    Find integer weights w with sum(w[i] * vectors[i]) == target, or None if target is
+    not in their span (Gaussian elimination over exact fractions).
+    """
+    rows = [[Fraction(vector[r]) for vector in vectors] + [Fraction(target[r])] for r in range(len(target))]
+    pivots = []
+    for column in range(len(vectors)):
+        pivot = next((r for r in range(len(pivots), len(rows)) if rows[r][column] != 0), None)
+        if pivot is None:
+            return None  # The vectors are dependent; the previous target was already reachable
+        rows[len(pivots)], rows[pivot] = rows[pivot], rows[len(pivots)]
+        row = rows[len(pivots)]
+        row[:] = [value / row[column] for value in row]
+        for other in rows:
+            if other is not row and other[column] != 0:
+                factor = other[column]
+                other[:] = [a - factor * b for a, b in zip(other, row)]
+        pivots.append(column)
+
+    if any(row[-1] != 0 for row in rows[len(pivots):]):
+        return None
+    weights = [rows[i][-1] for i in range(len(pivots))]
+    if any(weight.denominator != 1 for weight in weights):
+        raise ArithmeticError("Recurrence of the keypad map is not integral.")
+    return [int(weight) for weight in weights]
+
+
+@cache
+def linear_recurrence() -> tuple[list[tuple[str, str]], list[list[int]], list[int]]:
+    """
+    Return (pairs, seeds, recurrence) describing the directional costs beyond LINEAR_FROM_DEPTH.
+
+    seeds[i] holds the cost of every pair at depth LINEAR_FROM_DEPTH + i, and the costs at
+    any deeper level satisfy cost[d + k] = sum(recurrence[i] * cost[d + i]), where k is the
+    degree of the minimal polynomial of the map on these vectors.
+    """
+    transitions = transition_map()
+    pairs = list(transitions)
+    index = {pair: i for i, pair in enumerate(pairs)}
+    seed_table = build_cost_tables(LINEAR_FROM_DEPTH)[-1]
+    seeds = [[seed_table[pair] for pair in pairs]]
+
+    while True:
+        previous = seeds[-1]
+        following = [
+            sum(count * previous[index[pair_up]] for pair_up, count in transitions[pair].items())
+            for pair in pairs
+        ]
+        recurrence = _solve_combination(seeds, following)
+        if recurrence is not None:
+            return pairs, seeds, recurrence
+        seeds.append(following)
+
+
+def _polynomial_mulmod(a: list[int], b: list[int], recurrence: list[int]) -> list[int]:
+    """
+    Multiply two polynomials modulo x^k - sum(recurrence[i] * x^i).
+    """
+    k = len(recurrence)
+    product = [0] * (2 * k - 1)
+    if a is b:
+        # Squaring: each cross term appears twice, so compute it once
+        for i, x in enumerate(a):
+            if x:
+                product[2 * i] += x * x
+                doubled = 2 * x
+                for j in range(i + 1, k):
+                    if a[j]:
+                        product[i + j] += doubled * a[j]
+    else:
+        for i, x in enumerate(a):
+            if x:
+                for j, y in enumerate(b):
+                    if y:
+                        product[i + j] += x * y
+
+    # Fold the high terms back down using x^k = sum(recurrence[i] * x^i)
+    for degree in range(2 * k - 2, k - 1, -1):
+        coefficient = product[degree]
+        if coefficient:
+            for i, weight in enumerate(recurrence):
+                product[degree - k + i] += coefficient * weight
+    return product[:k]
+
+
+def _x_power_mod(exponent: int, recurrence: list[int]) -> list[int]:
+    """
+    Coefficients of x^exponent modulo the recurrence polynomial, by repeated squaring.
+    """
+    k = len(recurrence)
+    result = [1] + [0] * (k - 1)
+    for bit in bin(exponent)[2:]:
+        result = _polynomial_mulmod(result, result, recurrence)
+        if bit == '1':
+            # Multiply by x: shift up and fold the overflowing term
+            top = result[-1]
+            result = [0] + result[:-1]
+            if top:
+                for i, weight in enumerate(recurrence):
+                    result[i] += top * weight
+    return result
+
+
+def directional_pair_costs(depth: int) -> dict[tuple[str, str], int]:
+    """
+    Cost of moving between every two directional keys and pressing the second one,
+    with depth robots above.
+
+    Up to LINEAR_FROM_DEPTH this is the bottom-up table; beyond it the linear map is
+    applied via its minimal polynomial, so depth d costs O(log d) big-integer products.
+    """
+    if depth <= LINEAR_FROM_DEPTH:
+        return build_cost_tables(depth)[depth]
+
+    pairs, seeds, recurrence = linear_recurrence()
+    weights = _x_power_mod(depth - LINEAR_FROM_DEPTH, recurrence)
+    return {
+        pair: sum(weight * seed[i] for weight, seed in zip(weights, seeds) if weight)
+        for i, pair in enumerate(pairs)
+    }
+
+
+def compute_keypresses_deep(char_sequence: str, max_depth: int = 2) -> int:
+    """
+    Same result as compute_keypresses on the numeric keypad, for depths far beyond what
+    the recursion can reach (e.g. 10**6 robots).
+    """
+    directional_costs = directional_pair_costs(max_depth - 1) if max_depth > 0 else None
+    return sequence_cost(char_sequence, move_cost_table(NUM_KEYPAD, NUM_GAP, directional_costs))
+
+
+class KeypadCostCache:
+    """
+    Bounded, instrumented cache of numeric-keypad pair cost tables, keyed by both keypad
+    layouts and the depth.
+
+    Tables can be saved to and loaded from a small JSON file (costs as hex strings, which
+    also fit the huge values of very deep chains), so repeated runs start warm.
+    """
+
+    def __init__(self, maxsize: int | None = 64):
+        self.maxsize = maxsize
+        self.tables = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def layout_key() -> str:
+        """
+        Identify the keypad layouts the tables were computed for.
+        """
+        return '|'.join(NUMERIC_LAYOUT) + '/' + '|'.join(DIRECTIONAL_LAYOUT)
+
+    def _store(self, depth: int, table: dict[tuple[str, str], int]) -> None:
+        self.tables[depth] = table
+        self.tables.move_to_end(depth)
+        if self.maxsize is not None and len(self.tables) > self.maxsize:
+            self.tables.popitem(last=False)
+            self.evictions += 1
+
+    def numeric_costs(self, depth: int) -> dict[tuple[str, str], int]:
+        """
+        Pair cost table of the numeric keypad with depth directional keypads in between.
+        """
+        table = self.tables.get(depth)
+        if table is not None:
+            self.hits += 1
+            self.tables.move_to_end(depth)
+            return table
+
+        self.misses += 1
+        directional_costs = directional_pair_costs(depth - 1) if depth > 0 else None
+        table = move_cost_table(NUM_KEYPAD, NUM_GAP, directional_costs)
+        self._store(depth, table)
+        return table
+
+    def code_cost(self, char_sequence: str, max_depth: int = 2) -> int:
+        """
+        Button presses needed for a code, same as compute_keypresses.
+        """
+        return sequence_cost(char_sequence, self.numeric_costs(max_depth))
+
+    def stats(self) -> dict[str, int | None]:
+        """
+        Hit/miss/eviction counts and current size of the in-memory cache.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self.tables),
+            "maxsize": self.maxsize,
+        }
+
+    def save(self, path: str) -> None:
+        """
+        Write the cached tables to disk.
+        """
+        pairs = [(a, b) for a in NUM_KEYPAD for b in NUM_KEYPAD]
+        data = {
+            "layout": self.layout_key(),
+            "keys": ''.join(NUM_KEYPAD),
+            "tables": {str(depth): [format(table[pair], 'x') for pair in pairs]
+                       for depth, table in self.tables.items()},
+        }
+        with open(path, 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+
+    def load(self, path: str) -> int:
+        """
+        Read tables saved for the same keypad layouts; returns how many were loaded.
+        """
+        if not os.path.exists(path):
+            return 0
+        with open(path, 'r') as f:
+            data = json.load(f)
+        if data.get("layout") != self.layout_key() or data.get("keys") != ''.join(NUM_KEYPAD):
+            return 0
+
+        pairs = [(a, b) for a in NUM_KEYPAD for b in NUM_KEYPAD]
+        for depth, costs in data["tables"].items():
+            self._store(int(depth), {pair: int(cost, 16) for pair, cost in zip(pairs, costs)})
+        return len(data["tables"])
+
+
+def solve(lines: list[str], cost_cache: KeypadCostCache | None = None) -> None:
     """
     Compute and print results for part 1 and part 2 based on the given input lines.
     """
+    if cost_cache is None:
+        cost_cache = KeypadCostCache()
+
     part1_result = 0
     part2_result = 0
 
@@ -158,11 +502,11 @@ def solve(lines: list[str]) -> None:
         num_value = int(instruction[:-1])
 
         # Part 1 uses default depth=2
-        part1_keypresses = compute_keypresses(instruction)
+        part1_keypresses = cost_cache.code_cost(instruction)
         part1_result += num_value * part1_keypresses
 
         # Part 2 uses depth=25
-        part2_keypresses = compute_keypresses(instruction, max_depth=25)
+        part2_keypresses = cost_cache.code_cost(instruction, max_depth=25)
         part2_result += num_value * part2_keypresses
 
     print(f"Part 1 result: {part1_result}")
@@ -170,5 +514,12 @@ def solve(lines: list[str]) -> None:
 
 
 if __name__ == '__main__':
+    cache_file = "2024_day21_costs.json"
+    cost_cache = KeypadCostCache()
+    cost_cache.load(cache_file)
+
     instructions = parse_input("2024_day21_input.txt")
-    solve(instructions)
+    solve(instructions, cost_cache)
+
+    cost_cache.save(cache_file)
+    print(f"Cost cache: {cost_cache.stats()}")
@@ -1,32 +1,281 @@
 #!/usr/bin/env python3
 
-import networkx as nx
+import sys
+import time
 
 
-def main():
-    input_file = "2024_day23_input.txt"
-
-    G = nx.Graph()
-
-    # Read edges from file (each line is "X-Y" for an undirected edge)
+def parse_edges(input_file):
+    """Read the undirected edges (each line is "X-Y") from the input file."""
+    edges = []
     with open(input_file, "r") as f:
         for line in f:
             line = line.strip()
             if not line:
                 continue
             u, v = line.split('-')
-            G.add_edge(u, v)
+            edges.append((u, v))
+    return edges
+
+
+def intern_graph(edges):
+    """
+    Map computer names to dense integer ids and build neighbour sets.
+
+    Names starting with 't' get the lowest ids, so ids below t_count are exactly the
+    t-computers. Returns (names, neighbours, t_count).
+    """
+    names = sorted({name for edge in edges for name in edge}, key=lambda name: (not name.startswith('t'), name))
+    ids = {name: i for i, name in enumerate(names)}
+    neighbours = [set() for _ in names]
+    for u, v in edges:
+        a, b = ids[u], ids[v]
+        if a != b:
+            neighbours[a].add(b)
+            neighbours[b].add(a)
+    t_count = sum(name.startswith('t') for name in names)
+    return names, neighbours, t_count
+
+
+def count_t_triangles(neighbours, t_count):
+    """
+    Count the triangles that contain at least one t-computer.
+
+    Each triangle is counted once, at its lowest t-computer u: the other two corners are
+    then neighbours of u with a higher id, and every edge among those closes a triangle.
+    """
+    count = 0
+    for u in range(t_count):
+        higher = {v for v in neighbours[u] if v > u}
+        for v in higher:
+            count += len(neighbours[v] & higher)
+    return count // 2  # Every edge inside `higher` was seen from both ends
+
+
+def degeneracy_order(neighbours):
+    """
+    Order the vertices by repeatedly removing one of minimum remaining degree.
+
+    Returns (order, core) where core[v] is the core number of v: the largest remaining
+    degree seen at any removal up to and including v's own.
+    """
+    degree = [len(adjacent) for adjacent in neighbours]
+    buckets = [set() for _ in range(max(degree, default=0) + 1)]
+    for v, d in enumerate(degree):
+        buckets[d].add(v)
+
+    removed = [False] * len(neighbours)
+    core = [0] * len(neighbours)
+    order = []
+    current = level = 0
+    for _ in range(len(neighbours)):
+        current = max(current - 1, 0)
+        while not buckets[current]:
+            current += 1
+        v = buckets[current].pop()
+        removed[v] = True
+        level = max(level, current)
+        core[v] = level
+        order.append(v)
+        for w in neighbours[v]:
+            if not removed[w]:
+                buckets[degree[w]].discard(w)
+                degree[w] -= 1
+                buckets[degree[w]].add(w)
+    return order, core
+
+
+def _color_bound(candidates, adjacency):
+    """Upper bound on the clique size within candidates: the colours of a greedy colouring."""
+    colours = 0
+    while candidates:
+        colours += 1
+        uncoloured = candidates
+        while uncoloured:
+            low = uncoloured & -uncoloured
+            candidates &= ~low
+            uncoloured &= ~low & ~adjacency[low.bit_length() - 1]
+    return colours
+
+
+def _expand(clique, candidates, excluded, adjacency, labels, best):
+    """
+    Bron–Kerbosch with pivoting on local bitsets, pruned by size and colour bounds.
+
+    Bit i of candidates/excluded/adjacency stands for vertex labels[i]; best is updated in place.
+    """
+    if not candidates:
+        if not excluded and len(clique) > len(best):
+            best[:] = clique
+        return
+    if len(clique) + candidates.bit_count() <= len(best):
+        return
+    if len(clique) + _color_bound(candidates, adjacency) <= len(best):
+        return
+
+    # Pivot on the vertex covering the most candidates; only its non-neighbours branch
+    pool = candidates | excluded
+    pivot, most = 0, -1
+    while pool:
+        low = pool & -pool
+        pool ^= low
+        u = low.bit_length() - 1
+        covered = (candidates & adjacency[u]).bit_count()
+        if covered > most:
+            pivot, most = u, covered
+
+    branches = candidates & ~adjacency[pivot]
+    while branches:
+        low = branches & -branches
+        branches ^= low
+        v = low.bit_length() - 1
+        _expand(clique + [labels[v]], candidates & adjacency[v], excluded & adjacency[v], adjacency, labels, best)
+        candidates &= ~low
+        excluded |= low
+        if len(clique) + candidates.bit_count() <= len(best):
+            return
+
+
+def maximum_clique(neighbours, lower_bound=0, ordering=None):
+    """
+    Find a maximum clique (as a list of vertex ids) without listing every maximal one.
+
+    Vertices are visited in reverse degeneracy order; each one only searches among its
+    neighbours later in the order (at most its core number of them), re-indexed into
+    small local bitsets, and is skipped when even all of them could not beat the best.
+    Only cliques larger than lower_bound are looked for, so with a known clique the
+    result may be [] when there is none larger. ordering is a precomputed
+    (order, core) from degeneracy_order, whose order may leave out a pruned prefix.
+    """
+    order, core = ordering if ordering is not None else degeneracy_order(neighbours)
+    position = [-1] * len(neighbours)  # Vertices left out of order are never searched
+    for i, v in enumerate(order):
+        position[v] = i
+
+    best = [None] * lower_bound  # Stands in for the known clique until one beats it
+    for v in reversed(order):
+        if core[v] + 1 <= len(best):
+            continue
+        later = [w for w in neighbours[v] if position[w] > position[v]]
+        if len(later) + 1 <= len(best):
+            continue
+
+        # Degree pruning inside the subproblem: a clique beating the best needs len(best)
+        # later neighbours, each adjacent to at least len(best) - 1 of the others
+        candidates = set(later)
+        while len(candidates) >= len(best) > 1:
+            supported = {w for w in candidates if len(neighbours[w] & candidates) >= len(best) - 1}
+            if len(supported) == len(candidates):
+                break
+            candidates = supported
+        if len(candidates) + 1 <= len(best):
+            continue
+        later = [w for w in later if w in candidates]
+        earlier = [w for w in neighbours[v] if 0 <= position[w] < position[v]]
+
+        local = later + earlier
+        index = {w: i for i, w in enumerate(local)}
+        adjacency = []
+        for w in local:
+            mask = 0
+            for x in neighbours[w]:
+                i = index.get(x)
+                if i is not None:
+                    mask |= 1 << i
+            adjacency.append(mask)
+
+        _expand([v], (1 << len(later)) - 1, ((1 << len(earlier)) - 1) << len(later), adjacency, local, best)
+    return best if len(best) > lower_bound else []
+
+
+def greedy_clique(neighbours, order, tries=16):
+    """
+    Lower bound for the maximum clique: grow cliques greedily from the last vertices of
+    the degeneracy order, always adding the candidate adjacent to most other candidates.
+    """
+    best = []
+    for v in order[-tries:]:
+        clique = [v]
+        candidates = set(neighbours[v])
+        while candidates:
+            w = max(candidates, key=lambda x: len(neighbours[x] & candidates))
+            clique.append(w)
+            candidates &= neighbours[w]
+        if len(clique) > len(best):
+            best = clique
+    return best
+
+
+def prune_to_core(order, core, min_core):
+    """
+    Keep only the vertices whose core number is at least min_core.
+
+    A clique of size k lies inside the (k-1)-core, so with a known clique of size lb every
+    vertex of core number below lb can be dropped when looking for a larger one. Core
+    numbers never decrease along the degeneracy order, so those vertices are a prefix of
+    it and the remaining suffix is still a degeneracy order of the core.
+    """
+    cut = 0
+    while cut < len(order) and core[order[cut]] < min_core:
+        cut += 1
+    return order[cut:]
+
+
+def count_edges_within(neighbours, vertices):
+    """Number of edges with both endpoints in vertices."""
+    inside = set(vertices)
+    return sum(len(neighbours[v] & inside) for v in vertices) // 2
+
+
+def pruned_maximum_clique(neighbours):
+    """
+    maximum_clique restricted to the lb-core of a greedy lower bound lb.
+
+    The degeneracy order is computed once and shared with the search, which starts from
+    lb and so only reports a clique that beats it. Returns (clique, lower_bound, kept)
+    so callers can report what the pruning removed.
+    """
+    order, core = degeneracy_order(neighbours)
+    lower_bound = greedy_clique(neighbours, order)
+    kept = prune_to_core(order, core, len(lower_bound))
+    clique = maximum_clique(neighbours, len(lower_bound), (kept, core))
+    return clique or lower_bound, lower_bound, kept
+
+
+def max_clique_networkx(edges):
+    """Reference path: the largest maximal clique from networkx (imported only here)."""
+    import networkx as nx
+
+    G = nx.Graph()
+    G.add_edges_from(edges)
+    return max(nx.find_cliques(G), key=len)
+
+
+def main():
+    input_file = "2024_day23_input.txt"
+
+    edges = parse_edges(input_file)
 
     # --- Part 1 ---
-    all_cliques = nx.enumerate_all_cliques(G)
-    triangles = [c for c in all_cliques if len(c) == 3]
-    triangles_with_t = [tri for tri in triangles if any(node.startswith('t') for node in tri)]
-    print("Part 1 result (number of 3-cliques containing a 't'):", len(triangles_with_t))
+    names, neighbours, t_count = intern_graph(edges)
+    print("Part 1 result (number of 3-cliques containing a 't'):", count_t_triangles(neighbours, t_count))
 
     # --- Part 2 ---
     # Find the largest set of mutually connected computers (the maximum clique).
-    # nx.find_cliques(G) yields all maximal cliques; we choose the one with the greatest length.
-    max_clique = max(nx.find_cliques(G), key=len)  # largest clique by size
+    # Pass --networkx to cross-check with networkx's maximal-clique enumeration instead.
+    if "--networkx" in sys.argv[1:]:
+        max_clique = max_clique_networkx(edges)
+    else:
+        # Prune everything outside the lb-core of a greedy lower bound lb, then search exactly
+        started = time.perf_counter()
+        clique, lower_bound, kept = pruned_maximum_clique(neighbours)
+        elapsed = time.perf_counter() - started
+
+        total_edges = sum(len(adjacent) for adjacent in neighbours) // 2
+        kept_edges = count_edges_within(neighbours, kept)
+        print(f"Pruning (lower bound {len(lower_bound)}): removed {len(neighbours) - len(kept)} of "
+              f"{len(neighbours)} nodes and {total_edges - kept_edges} of {total_edges} edges, "
+              f"clique search took {elapsed:.4f}s")
+        max_clique = [names[v] for v in clique]
 
     # Sort the computer names alphabetically and join them with commas
     password = ",".join(sorted(max_clique))
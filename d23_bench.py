@@ -0,0 +1,89 @@
+import random
+import sys
+import time
+
+from d23 import count_edges_within, count_t_triangles, intern_graph, maximum_clique, pruned_maximum_clique
+
+
+def random_lan(nodes, degree=13, seed=23):
+    """Random graph with the puzzle's average degree; about 1 in 26 names starts with 't'."""
+    rng = random.Random(seed)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    names = [f"{letters[i % 26]}{i}" for i in range(nodes)]
+    rng.shuffle(names)
+    edges = set()
+    while len(edges) < nodes * degree // 2:
+        u, v = rng.sample(names, 2)
+        edges.add((min(u, v), max(u, v)))
+        # Close some triangles so there is something to count
+        if rng.random() < 0.3:
+            w = rng.choice(names)
+            if w not in (u, v):
+                edges.add((min(u, w), max(u, w)))
+                edges.add((min(v, w), max(v, w)))
+    return sorted(edges)
+
+
+def plant_clique(edges, size=13, seed=23):
+    """Adds a clique of the given size on random existing nodes, like the puzzle's LAN party."""
+    rng = random.Random(seed)
+    members = rng.sample(sorted({node for edge in edges for node in edge}), size)
+    planted = {(min(u, v), max(u, v)) for u in members for v in members if u != v}
+    return sorted(set(edges) | planted)
+
+
+def compare_pruning(label, edges):
+    """Times the k-core pruning stage against searching the whole graph."""
+    names, neighbours, t_count = intern_graph(edges)
+
+    start = time.perf_counter()
+    clique, lower_bound, kept = pruned_maximum_clique(neighbours)
+    pruned_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    unpruned = maximum_clique(neighbours)
+    full_time = time.perf_counter() - start
+
+    assert len(clique) == len(unpruned), f"{label}: {len(clique)} != {len(unpruned)}"
+    removed_edges = len(edges) - count_edges_within(neighbours, kept)
+    print(f"{label:>36}max clique {len(clique)} (lower bound {len(lower_bound)}) | pruned "
+          f"{len(neighbours) - len(kept):,} nodes, {removed_edges:,} edges | {pruned_time:.3f}s vs "
+          f"{full_time:.3f}s unpruned (saved {full_time - pruned_time:.3f}s)")
+
+
+def networkx_count(edges):
+    """The original part 1: enumerate every clique and keep the t-triangles."""
+    import networkx as nx
+
+    G = nx.Graph()
+    G.add_edges_from(edges)
+    triangles = [c for c in nx.enumerate_all_cliques(G) if len(c) == 3]
+    return sum(any(node.startswith('t') for node in tri) for tri in triangles)
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [500, 2_000, 10_000, 50_000, 100_000]
+    for nodes in sizes:
+        edges = random_lan(nodes)
+
+        start = time.perf_counter()
+        names, neighbours, t_count = intern_graph(edges)
+        count = count_t_triangles(neighbours, t_count)
+        engine_time = time.perf_counter() - start
+
+        line = f"{nodes:>7,} nodes, {len(edges):>9,} edges: {count:,} t-triangles | engine {engine_time:.3f}s"
+        if nodes <= 10_000:
+            try:
+                start = time.perf_counter()
+                expected = networkx_count(edges)
+                networkx_time = time.perf_counter() - start
+            except ImportError:
+                pass
+            else:
+                assert count == expected, f"{nodes} nodes: {count} != {expected}"
+                line += f" | networkx {networkx_time:.3f}s | speedup {networkx_time / engine_time:.0f}x"
+        print(line)
+
+        # Part 2: the k-core pruning stage, without and with a planted LAN party
+        compare_pruning("", edges)
+        compare_pruning("planted: ", plant_clique(edges))